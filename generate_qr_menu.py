@@ -6,14 +6,28 @@ A complete QR menu system with carbon footprint calculation for restaurants.
 """
 
 import os
+import logging
+import re
 import json
 import qrcode
+import numpy as np
+from PIL import Image
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from html import escape
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class MenuItem:
+    # Fixed attribute layout instead of a per-instance __dict__; the last two
+    # slots hold HTML-escaped copies for the digital menu, computed once per item
+    __slots__ = ('name', 'price', 'description', 'carbon_footprint', 'is_eco_friendly',
+                 'ingredients', 'cooking_methods', 'name_html', 'description_html')
+    
     name: str
     price: float
     description: str
@@ -21,185 +35,187 @@ class MenuItem:
     is_eco_friendly: bool
     ingredients: List[str]
     cooking_methods: List[str]
+    
+    def __post_init__(self):
+        self.name_html = escape(self.name)
+        self.description_html = escape(self.description)
 
-class CarbonCalculator:
-    """Simple carbon footprint calculator"""
+# Carbon factors (kg CO2 per kg ingredient)
+_CARBON_FACTORS = MappingProxyType({
+    'beef': 27.0, 'lamb': 39.2, 'pork': 12.1, 
+    'chicken': 6.9, 'fish': 6.1, 'salmon': 6.1,
+    'cheese': 13.5, 'milk': 3.2, 'butter': 23.8, 'eggs': 4.8,
+    'rice': 2.7, 'pasta': 0.9, 'bread': 0.9,
+    'vegetables': 2.0, 'tomatoes': 2.1, 'potatoes': 0.5,
+    'fruits': 1.1, 'olive_oil': 6.0, 'nuts': 2.3,
+    'beans': 2.0, 'quinoa': 1.5
+})
+
+# Cooking method carbon factors (kg CO2 per hour)
+_COOKING_FACTORS = MappingProxyType({
+    'oven': 2.1, 'stovetop': 1.8, 'grill': 3.5,
+    'deep_fry': 4.2, 'microwave': 0.6, 'steam': 1.0,
+    'raw': 0.0
+})
+
+# Dish name keywords per category, in priority order: if a name matches
+# several groups of one category, the earlier group wins. Each group maps
+# to (ingredient or cooking method, kg CO2 added to the dish).
+_COOKING_TIME = 20  # default minutes
+
+_PROTEIN = (
+    (('beef', 'steak', 'hamburger'), 'beef', _CARBON_FACTORS['beef'] * 0.25),  # 250g beef
+    (('chicken', 'tavuk'), 'chicken', _CARBON_FACTORS['chicken'] * 0.2),  # 200g chicken
+    (('fish', 'salmon', 'balık'), 'fish', _CARBON_FACTORS['fish'] * 0.18),  # 180g fish
+    (('pork', 'bacon', 'ham'), 'pork', _CARBON_FACTORS['pork'] * 0.2),  # 200g pork
+    (('lamb', 'kuzu'), 'lamb', _CARBON_FACTORS['lamb'] * 0.2),  # 200g lamb
+)
+
+_CARBS = (
+    (('pasta', 'spaghetti', 'makarna'), 'pasta', _CARBON_FACTORS['pasta'] * 0.1),  # 100g pasta
+    (('rice', 'pilav', 'risotto'), 'rice', _CARBON_FACTORS['rice'] * 0.1),  # 100g rice
+    (('sandwich', 'burger', 'bread'), 'bread', _CARBON_FACTORS['bread'] * 0.08),  # 80g bread
+    (('quinoa',), 'quinoa', _CARBON_FACTORS['quinoa'] * 0.1),  # 100g quinoa
+)
+
+_VEGETABLES = (
+    (('salad', 'salata', 'vegetables'), 'vegetables', _CARBON_FACTORS['vegetables'] * 0.2),  # 200g vegetables
+)
+
+_DAIRY = (
+    (('cheese', 'peynir', 'parmesan'), 'cheese', _CARBON_FACTORS['cheese'] * 0.05),  # 50g cheese
+)
+
+_COOKING = (
+    (('grilled', 'ızgara', 'grill'), 'grill', _COOKING_FACTORS['grill'] * (_COOKING_TIME / 60)),
+    (('fried', 'kızartma'), 'deep_fry', _COOKING_FACTORS['deep_fry'] * (15 / 60)),  # 15 min frying
+    (('baked', 'roasted', 'fırın'), 'oven', _COOKING_FACTORS['oven'] * (30 / 60)),  # 30 min baking
+    (('salad', 'fresh', 'raw'), 'raw', _COOKING_FACTORS['raw']),
+)
+
+# Used when no keyword of the category is found (vegetables are always added)
+_DEFAULTS = {
+    'vegetables': (None, 'vegetables', _CARBON_FACTORS['vegetables'] * 0.1),  # 100g vegetables
+    'cooking': (None, 'stovetop', _COOKING_FACTORS['stovetop'] * (_COOKING_TIME / 60)),
+}
+
+def _build_keyword_table() -> Dict[str, List[tuple]]:
+    """Map each keyword to its (category, rank, label, carbon) entries.
+
+    A keyword may feed several categories ('salad' is both vegetables and
+    raw cooking).
+    """
+    table = {}
+    categories = (('protein', _PROTEIN), ('carbs', _CARBS), ('vegetables', _VEGETABLES),
+                  ('dairy', _DAIRY), ('cooking', _COOKING))
+    for category, groups in categories:
+        for rank, (words, label, carbon) in enumerate(groups):
+            for word in words:
+                table.setdefault(word, []).append((category, rank, label, carbon))
+    return table
+
+_KEYWORDS = _build_keyword_table()
+
+def _trie_regex(words) -> str:
+    """Build a prefix-factored alternation, e.g. ['grill', 'grilled'] -> 'grill(?:ed)?'
+
+    Branches at each node start with distinct characters, so the regex
+    engine commits to one branch per character instead of retrying every
+    keyword; greedy optional suffixes prefer the longest keyword.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # a keyword ends here
     
-    def __init__(self):
-        # Carbon factors (kg CO2 per kg ingredient)
-        self.carbon_factors = {
-            'beef': 27.0, 'lamb': 39.2, 'pork': 12.1, 
-            'chicken': 6.9, 'fish': 6.1, 'salmon': 6.1,
-            'cheese': 13.5, 'milk': 3.2, 'butter': 23.8, 'eggs': 4.8,
-            'rice': 2.7, 'pasta': 0.9, 'bread': 0.9,
-            'vegetables': 2.0, 'tomatoes': 2.1, 'potatoes': 0.5,
-            'fruits': 1.1, 'olive_oil': 6.0, 'nuts': 2.3,
-            'beans': 2.0, 'quinoa': 1.5
-        }
-        
-        # Cooking method carbon factors (kg CO2 per hour)
-        self.cooking_factors = {
-            'oven': 2.1, 'stovetop': 1.8, 'grill': 3.5,
-            'deep_fry': 4.2, 'microwave': 0.6, 'steam': 1.0,
-            'raw': 0.0
-        }
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:%s)?' % '|'.join(branches)
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:%s)' % '|'.join(branches)
     
-    def estimate_carbon_footprint(self, dish_name: str) -> Dict:
-        """Estimate carbon footprint based on dish name"""
-        dish_lower = dish_name.lower()
-        
-        # Simple ingredient estimation
-        ingredients = []
-        total_carbon = 0.0
-        
-        # Protein detection
-        if any(meat in dish_lower for meat in ['beef', 'steak', 'hamburger']):
-            ingredients.append('beef')
-            total_carbon += 27.0 * 0.25  # 250g beef
-        elif any(chicken in dish_lower for chicken in ['chicken', 'tavuk']):
-            ingredients.append('chicken')
-            total_carbon += 6.9 * 0.2  # 200g chicken
-        elif any(fish in dish_lower for fish in ['fish', 'salmon', 'balık']):
-            ingredients.append('fish')
-            total_carbon += 6.1 * 0.18  # 180g fish
-        elif any(pork in dish_lower for pork in ['pork', 'bacon', 'ham']):
-            ingredients.append('pork')
-            total_carbon += 12.1 * 0.2  # 200g pork
-        elif any(lamb in dish_lower for lamb in ['lamb', 'kuzu']):
-            ingredients.append('lamb')
-            total_carbon += 39.2 * 0.2  # 200g lamb
-        
-        # Carbs detection
-        if any(pasta in dish_lower for pasta in ['pasta', 'spaghetti', 'makarna']):
-            ingredients.append('pasta')
-            total_carbon += 0.9 * 0.1  # 100g pasta
-        elif any(rice in dish_lower for rice in ['rice', 'pilav', 'risotto']):
-            ingredients.append('rice')
-            total_carbon += 2.7 * 0.1  # 100g rice
-        elif any(bread in dish_lower for bread in ['sandwich', 'burger', 'bread']):
-            ingredients.append('bread')
-            total_carbon += 0.9 * 0.08  # 80g bread
-        elif any(quinoa in dish_lower for quinoa in ['quinoa']):
-            ingredients.append('quinoa')
-            total_carbon += 1.5 * 0.1  # 100g quinoa
-        
-        # Vegetables (always add some)
-        if any(salad in dish_lower for salad in ['salad', 'salata', 'vegetables']):
-            ingredients.append('vegetables')
-            total_carbon += 2.0 * 0.2  # 200g vegetables
-        else:
-            ingredients.append('vegetables')
-            total_carbon += 2.0 * 0.1  # 100g vegetables
-        
-        # Dairy
-        if any(cheese in dish_lower for cheese in ['cheese', 'peynir', 'parmesan']):
-            ingredients.append('cheese')
-            total_carbon += 13.5 * 0.05  # 50g cheese
-        
-        # Cooking method detection
-        cooking_methods = []
-        cooking_carbon = 0.0
-        cooking_time = 20  # default minutes
-        
-        if any(grilled in dish_lower for grilled in ['grilled', 'ızgara', 'grill']):
-            cooking_methods.append('grill')
-            cooking_carbon = 3.5 * (cooking_time / 60)
-        elif any(fried in dish_lower for fried in ['fried', 'kızartma']):
-            cooking_methods.append('deep_fry')
-            cooking_carbon = 4.2 * (15 / 60)  # 15 min frying
-        elif any(baked in dish_lower for baked in ['baked', 'roasted', 'fırın']):
-            cooking_methods.append('oven')
-            cooking_carbon = 2.1 * (30 / 60)  # 30 min baking
-        elif any(raw in dish_lower for raw in ['salad', 'fresh', 'raw']):
-            cooking_methods.append('raw')
-            cooking_carbon = 0.0
-        else:
-            cooking_methods.append('stovetop')
-            cooking_carbon = 1.8 * (cooking_time / 60)
-        
-        total_carbon += cooking_carbon
-        
-        return {
-            'ingredients': ingredients,
-            'cooking_methods': cooking_methods,
-            'total_carbon': round(total_carbon, 2),
-            'is_eco_friendly': total_carbon < 2.0
-        }
+    return render(trie)
 
-class QRMenuSystem:
-    """Main QR Menu System"""
+# One matcher for all keywords. The lookahead reports overlapping hits
+# ('burger' inside 'hamburger'); at each position the longest keyword wins.
+_KEYWORD_PATTERN = re.compile('(?=(%s))' % _trie_regex(_KEYWORDS))
+
+# Keywords are made of letters only, so a match never spans two words
+_WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+@lru_cache(maxsize=4096)
+def _word_hits(word: str) -> tuple:
+    """Return the keyword entries (category, rank, label, carbon) found in one word"""
+    return tuple(entry for match in _KEYWORD_PATTERN.finditer(word) for entry in _KEYWORDS[match.group(1)])
+
+@lru_cache(maxsize=4096)
+def _estimate(dish_lower: str) -> tuple:
+    """Return (ingredients, cooking_methods, total_carbon, is_eco_friendly) for a lowercased dish name"""
+    # Tokenize once and look up each distinct word (shared across dishes);
+    # keep the best-ranked hit per category
+    hits = {}
+    for word in set(_WORD_PATTERN.findall(dish_lower)):
+        for category, rank, label, carbon in _word_hits(word):
+            if category not in hits or rank < hits[category][0]:
+                hits[category] = (rank, label, carbon)
     
-    def __init__(self, restaurant_name: str = "Green Restaurant"):
-        self.restaurant_name = restaurant_name
-        self.calculator = CarbonCalculator()
-        self.menu_items = []
+    # Simple ingredient estimation
+    ingredients = []
+    total_carbon = 0.0
+    for category in ('protein', 'carbs', 'vegetables', 'dairy'):
+        hit = hits.get(category) or _DEFAULTS.get(category)
+        if hit:
+            ingredients.append(hit[1])
+            total_carbon += hit[2]
     
-    def add_menu_item(self, name: str, price: float, description: str = "") -> MenuItem:
-        """Add a menu item with carbon calculation"""
-        print(f"Adding: {name}")
-        
-        # Calculate carbon footprint
-        carbon_data = self.calculator.estimate_carbon_footprint(name)
-        
-        # Create menu item
-        item = MenuItem(
-            name=name,
-            price=price,
-            description=description or f"Delicious {name.lower()}",
-            carbon_footprint=carbon_data['total_carbon'],
-            is_eco_friendly=carbon_data['is_eco_friendly'],
-            ingredients=carbon_data['ingredients'],
-            cooking_methods=carbon_data['cooking_methods']
-        )
-        
-        self.menu_items.append(item)
-        
-        eco_status = "🌱 Eco-friendly" if item.is_eco_friendly else "🔥 High carbon"
-        print(f"  → {item.carbon_footprint} kg CO2 - {eco_status}")
-        
-        return item
+    # Cooking method detection
+    _, method, cooking_carbon = hits.get('cooking') or _DEFAULTS['cooking']
+    total_carbon += cooking_carbon
     
-    def generate_qr_code(self, filename: str = "qr_menu.png") -> str:
-        """Generate QR code"""
-        try:
-            menu_url = f"https://your-restaurant.com/menu/1"
-            
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(menu_url)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            img.save(filename)
-            
-            print(f"✅ QR code saved: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"❌ QR code generation failed: {e}")
-            return ""
+    return tuple(ingredients), (method,), round(total_carbon, 2), total_carbon < 2.0
+
+class CarbonCalculator:
+    """Simple carbon footprint calculator"""
     
-    def generate_html_menu(self, filename: str = "digital_menu.html") -> str:
-        """Generate HTML menu"""
-        try:
-            # Calculate statistics
-            total_items = len(self.menu_items)
-            eco_items = sum(1 for item in self.menu_items if item.is_eco_friendly)
-            avg_carbon = sum(item.carbon_footprint for item in self.menu_items) / total_items if total_items > 0 else 0
-            
-            # Sort items by carbon footprint
-            sorted_items = sorted(self.menu_items, key=lambda x: x.carbon_footprint)
-            
-            html = f"""<!DOCTYPE html>
+    # Shared read-only lookup tables
+    carbon_factors = _CARBON_FACTORS
+    cooking_factors = _COOKING_FACTORS
+    
+    def estimate_carbon_footprint(self, dish_name: str) -> Dict:
+        """Estimate carbon footprint based on dish name"""
+        return self.estimate_carbon_footprints([dish_name])[0]
+    
+    def estimate_carbon_footprints(self, dish_names: List[str]) -> List[Dict]:
+        """Estimate carbon footprints for a batch of dish names (e.g. a bulk menu import)"""
+        # Score each distinct name once; repeated dishes share the result
+        estimates = {dish_lower: _estimate(dish_lower) for dish_lower in set(map(str.lower, dish_names))}
+        results = []
+        for dish_name in dish_names:
+            ingredients, cooking_methods, total_carbon, is_eco_friendly = estimates[dish_name.lower()]
+            results.append({
+                'ingredients': list(ingredients),
+                'cooking_methods': list(cooking_methods),
+                'total_carbon': total_carbon,
+                'is_eco_friendly': is_eco_friendly
+            })
+        return results
+
+# Output files are written through a 1 MiB buffer
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Static parts of the digital menu page, filled in with str.format
+_MENU_HEADER_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.restaurant_name} - Digital Menu</title>
+    <title>{restaurant_name} - Digital Menu</title>
     <style>
         body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
         .container {{ max-width: 800px; margin: 0 auto; background: white; border-radius: 10px; padding: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
@@ -219,76 +235,238 @@ class QRMenuSystem:
 <body>
     <div class="container">
         <div class="header">
-            <h1>{self.restaurant_name}</h1>
+            <h1>{restaurant_name}</h1>
             <p>🌱 Sustainable Digital Menu with Carbon Footprint</p>
         </div>
         
         <div class="stats">
             <strong>Menu Statistics:</strong> 
-            {total_items} items • {eco_items} eco-friendly ({eco_items/total_items*100:.0f}%) • 
+            {total_items} items • {eco_items} eco-friendly ({eco_percent:.0f}%) • 
             Average: {avg_carbon:.1f} kg CO2
         </div>
         
         <div class="menu-items">"""
-            
-            for item in sorted_items:
-                eco_class = "eco" if item.is_eco_friendly else ""
-                carbon_class = "carbon-high" if item.carbon_footprint > 4.0 else ""
-                eco_icon = "🌱" if item.is_eco_friendly else ""
-                
-                html += f"""
+
+# One menu entry of the digital menu, filled in per item
+_MENU_ITEM_HTML = """
             <div class="menu-item {eco_class}">
                 <div class="item-info">
-                    <div class="item-name">{item.name} {eco_icon}</div>
-                    <div class="item-description">{item.description}</div>
+                    <div class="item-name">{name} {eco_icon}</div>
+                    <div class="item-description">{description}</div>
                     <div class="carbon-info {carbon_class}">
-                        🌍 {item.carbon_footprint} kg CO2 • 
-                        Ingredients: {', '.join(item.ingredients[:3])}
+                        🌍 {carbon} kg CO2 • 
+                        Ingredients: {ingredients}
                     </div>
                 </div>
-                <div class="item-price">{item.price:.2f} ₺</div>
+                <div class="item-price">{price:.2f} ₺</div>
             </div>"""
-            
-            html += f"""
+
+_MENU_FOOTER_HTML = """
         </div>
         
         <div class="footer">
             <h3>🌱 Thank you for choosing sustainable dining!</h3>
             <p>Look for the 🌱 symbol for our most eco-friendly choices (under 2.0 kg CO2)</p>
-            <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+            <p>Generated: {generated}</p>
         </div>
     </div>
 </body>
 </html>"""
+
+class QRMenuSystem:
+    """Main QR Menu System"""
+    
+    def __init__(self, restaurant_name: str = "Green Restaurant"):
+        self.restaurant_name = restaurant_name
+        self.calculator = CarbonCalculator()
+        # Add items only through add_menu_item(s): the running statistics and the
+        # carbon column below are derived from this list and are not rebuilt from it
+        self.menu_items = []
+        self._qr_cache = {}  # menu URL -> rendered QR image
+        
+        # Running statistics, updated as items are added
+        self._carbon_sum = 0.0
+        self._eco_count = 0
+        
+        # Carbon footprints as a contiguous column parallel to menu_items, so
+        # analytics don't walk the item objects. Capacity grows geometrically;
+        # only the first len(menu_items) entries are in use.
+        self._carbon = np.empty(16)
+    
+    @property
+    def eco_count(self) -> int:
+        """Number of eco-friendly menu items"""
+        return self._eco_count
+    
+    def add_menu_item(self, name: str, price: float, description: str = "") -> MenuItem:
+        """Add a menu item with carbon calculation"""
+        item = self._add_items([(name, price, description)])[0]
+        logger.debug("Added %s: %s kg CO2 (eco-friendly: %s)", name, item.carbon_footprint, item.is_eco_friendly)
+        return item
+    
+    def add_menu_items(self, items: List[Tuple[str, float, str]]) -> List[MenuItem]:
+        """Add several (name, price, description) menu items in one batch"""
+        new_items = self._add_items(items)
+        logger.debug("Added %d menu items", len(new_items))
+        return new_items
+    
+    def _add_items(self, items: List[Tuple[str, float, str]]) -> List[MenuItem]:
+        """Create menu items with carbon calculation and append them to the menu"""
+        items = list(items)
+        
+        # Calculate carbon footprints for the whole batch
+        estimates = self.calculator.estimate_carbon_footprints([name for name, _, _ in items])
+        
+        new_items = []
+        for (name, price, description), carbon_data in zip(items, estimates):
+            # Create menu item
+            item = MenuItem(
+                name=name,
+                price=price,
+                description=description or f"Delicious {name.lower()}",
+                carbon_footprint=carbon_data['total_carbon'],
+                is_eco_friendly=carbon_data['is_eco_friendly'],
+                ingredients=carbon_data['ingredients'],
+                cooking_methods=carbon_data['cooking_methods']
+            )
+            new_items.append(item)
+            self._carbon_sum += item.carbon_footprint
+            self._eco_count += item.is_eco_friendly
+        
+        # Grow the carbon column at most once per batch
+        start = len(self.menu_items)
+        end = start + len(new_items)
+        if end > self._carbon.size:
+            grown = np.empty(max(end, 2 * self._carbon.size))
+            grown[:start] = self._carbon[:start]
+            self._carbon = grown
+        self._carbon[start:end] = [item.carbon_footprint for item in new_items]
+        self.menu_items.extend(new_items)
+        
+        return new_items
+    
+    def _carbon_order(self) -> np.ndarray:
+        """Indices of menu_items sorted by carbon footprint (ties keep insertion order)"""
+        return np.argsort(self._carbon[:len(self.menu_items)], kind='stable')
+    
+    def _carbon_extremes(self, k: int) -> tuple:
+        """Indices of the k lowest and k highest carbon items, in carbon order.
+        
+        Selects with a linear-time partition instead of sorting the whole
+        menu; ties resolve the same way as in _carbon_order().
+        """
+        carbon = self._carbon[:len(self.menu_items)]
+        size = carbon.size
+        if size <= k:
+            order = self._carbon_order()
+            return order, order
+        
+        partitioned = np.partition(carbon, (k - 1, size - k))
+        lowest = np.flatnonzero(carbon <= partitioned[k - 1])
+        highest = np.flatnonzero(carbon >= partitioned[size - k])
+        lowest = lowest[np.argsort(carbon[lowest], kind='stable')][:k]
+        highest = highest[np.argsort(carbon[highest], kind='stable')][-k:]
+        return lowest, highest
+    
+    def generate_qr_code(self, filename: str = "qr_menu.png") -> str:
+        """Generate QR code"""
+        menu_url = f"https://your-restaurant.com/menu/1"
+        
+        # Encoding only depends on the URL; reuse the image on later calls
+        img = self._qr_cache.get(menu_url)
+        if img is None:
+            box_size = 10
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=box_size,
+                border=4,
+            )
+            qr.add_data(menu_url)
+            qr.make(fit=True)
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            print(f"✅ HTML menu saved: {filename}")
-            return filename
-            
-        except Exception as e:
+            # Rasterize the module matrix (border included) in one NumPy pass
+            # instead of drawing every module; white is True in a 1-bit image
+            white = ~np.array(qr.get_matrix(), dtype=bool)
+            img = Image.fromarray(white.repeat(box_size, axis=0).repeat(box_size, axis=1))
+            self._qr_cache[menu_url] = img
+        
+        try:
+            img.save(filename)
+        except OSError as e:
+            print(f"❌ QR code generation failed: {e}")
+            return ""
+        
+        print(f"✅ QR code saved: {filename}")
+        return filename
+    
+    def generate_html_menu(self, filename: str = "digital_menu.html") -> str:
+        """Generate HTML menu"""
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+        
+        # Calculate statistics
+        total_items = len(self.menu_items)
+        eco_items = self._eco_count
+        avg_carbon = self._carbon_sum / total_items if total_items > 0 else 0
+        eco_percent = eco_items / total_items * 100 if total_items > 0 else 0
+        
+        header = _MENU_HEADER_HTML.format(
+            restaurant_name=escape(self.restaurant_name),
+            total_items=total_items,
+            eco_items=eco_items,
+            eco_percent=eco_percent,
+            avg_carbon=avg_carbon,
+        )
+        
+        # Stream the page item by item instead of building it in memory
+        try:
+            with open(filename, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(header)
+                for i in self._carbon_order():
+                    item = self.menu_items[i]
+                    f.write(_MENU_ITEM_HTML.format(
+                        eco_class="eco" if item.is_eco_friendly else "",
+                        carbon_class="carbon-high" if item.carbon_footprint > 4.0 else "",
+                        eco_icon="🌱" if item.is_eco_friendly else "",
+                        name=item.name_html,
+                        description=item.description_html,
+                        carbon=item.carbon_footprint,
+                        ingredients=', '.join(item.ingredients[:3]),
+                        price=item.price,
+                    ))
+                f.write(_MENU_FOOTER_HTML.format(generated=generated))
+        except OSError as e:
             print(f"❌ HTML generation failed: {e}")
             return ""
+        
+        print(f"✅ HTML menu saved: {filename}")
+        return filename
     
     def generate_report(self, filename: str = "sustainability_report.txt") -> str:
         """Generate sustainability report"""
-        try:
-            total_items = len(self.menu_items)
-            if total_items == 0:
-                return ""
-            
-            eco_items = sum(1 for item in self.menu_items if item.is_eco_friendly)
-            avg_carbon = sum(item.carbon_footprint for item in self.menu_items) / total_items
-            
-            # Get top and bottom items
-            sorted_items = sorted(self.menu_items, key=lambda x: x.carbon_footprint)
-            lowest_carbon = sorted_items[:3]
-            highest_carbon = sorted_items[-3:]
-            
-            report = f"""SUSTAINABILITY REPORT - {self.restaurant_name}
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        total_items = len(self.menu_items)
+        if total_items == 0:
+            return ""
+        
+        eco_items = self._eco_count
+        avg_carbon = self._carbon_sum / total_items
+        
+        # Carbon distribution from vectorized masks over the carbon column
+        carbon = self._carbon[:total_items]
+        low_carbon = np.count_nonzero(carbon < 2.0)
+        high_carbon = np.count_nonzero(carbon >= 4.0)
+        medium_carbon = total_items - low_carbon - high_carbon
+        
+        # Get top and bottom items
+        lowest, highest = self._carbon_extremes(3)
+        lowest_carbon = [self.menu_items[i] for i in lowest]
+        highest_carbon = [self.menu_items[i] for i in highest]
+        
+        report = f"""SUSTAINABILITY REPORT - {self.restaurant_name}
 {'='*60}
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated: {generated}
 
 OVERVIEW:
 - Total Menu Items: {total_items}
@@ -296,9 +474,9 @@ OVERVIEW:
 - Average Carbon Footprint: {avg_carbon:.2f} kg CO2
 
 CARBON DISTRIBUTION:
-- Low Carbon (< 2.0 kg): {len([i for i in self.menu_items if i.carbon_footprint < 2.0])} items
-- Medium Carbon (2.0-4.0 kg): {len([i for i in self.menu_items if 2.0 <= i.carbon_footprint < 4.0])} items  
-- High Carbon (> 4.0 kg): {len([i for i in self.menu_items if i.carbon_footprint >= 4.0])} items
+- Low Carbon (< 2.0 kg): {low_carbon} items
+- Medium Carbon (2.0-4.0 kg): {medium_carbon} items  
+- High Carbon (> 4.0 kg): {high_carbon} items
 
 MOST ECO-FRIENDLY ITEMS:
 {chr(10).join(f'• {item.name}: {item.carbon_footprint} kg CO2' for item in lowest_carbon)}
@@ -320,16 +498,16 @@ NEXT STEPS:
 4. Update menu seasonally
 5. Track progress monthly
 """
-            
-            with open(filename, 'w', encoding='utf-8') as f:
+        
+        try:
+            with open(filename, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
                 f.write(report)
-            
-            print(f"✅ Report saved: {filename}")
-            return filename
-            
-        except Exception as e:
+        except OSError as e:
             print(f"❌ Report generation failed: {e}")
             return ""
+        
+        print(f"✅ Report saved: {filename}")
+        return filename
     
     def create_sample_menu(self):
         """Create sample menu items"""
@@ -346,8 +524,10 @@ NEXT STEPS:
             ("Seasonal Fruit Bowl", 20.00, "Fresh seasonal fruits")
         ]
         
-        for name, price, description in sample_items:
-            self.add_menu_item(name, price, description)
+        items = self.add_menu_items(sample_items)
+        
+        eco_count = sum(1 for item in items if item.is_eco_friendly)
+        print(f"Added {len(items)} items ({eco_count} 🌱 eco-friendly)")
 
 def main():
     """Main function"""
@@ -378,7 +558,9 @@ def main():
             try:
                 price = float(input(f"Price for '{name}': "))
                 description = input(f"Description (optional): ").strip()
-                system.add_menu_item(name, price, description)
+                item = system.add_menu_item(name, price, description)
+                eco_status = "🌱 Eco-friendly" if item.is_eco_friendly else "🔥 High carbon"
+                print(f"  → {item.carbon_footprint} kg CO2 - {eco_status}")
             except ValueError:
                 print("Invalid price, please enter a number")
     else:
@@ -397,7 +579,7 @@ def main():
     print("=" * 50)
     print(f"Restaurant: {restaurant_name}")
     print(f"Menu Items: {len(system.menu_items)}")
-    print(f"Eco-friendly: {sum(1 for i in system.menu_items if i.is_eco_friendly)}")
+    print(f"Eco-friendly: {system.eco_count}")
     
     if html_file:
         print(f"📱 Digital Menu: {html_file}")
@@ -1,16 +1,14 @@
 import streamlit as st
 import pandas as pd
-import qrcode
-from PIL import Image
 import io
-import base64
-import json
+import os
 import datetime
-import re
+import itertools
+import sqlite3
+import threading
+import warnings
 from typing import List, Dict, Tuple
-import uuid
 import numpy as np
-import random
 
 # Page configuration
 st.set_page_config(
@@ -21,7 +19,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #FF6B35, #F7931E);
@@ -60,28 +58,69 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+HEADER_HTML = """
+<div class="main-header">
+    <h1>🍕 Restaurant Sales & Marketing System</h1>
+    <p>Complete solution for restaurant management, sales tracking, and marketing automation</p>
+</div>
+"""
+
+
+# Star strings for ratings 0-5, indexed by rating
+STARS = tuple("⭐" * i for i in range(6))
+
+# Feedback outlives sessions, so it goes to disk rather than session state; anchored
+# to the app directory so the database doesn't depend on where streamlit was launched
+FEEDBACK_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feedback.db")
 
 
 # Initialize session state
 def initialize_session_state():
     """Initialize all session state variables"""
     if 'restaurants' not in st.session_state:
-        st.session_state.restaurants = []
-    if 'menu_items' not in st.session_state:
-        st.session_state.menu_items = []
+        st.session_state.restaurants = {}
+    if 'restaurant_names' not in st.session_state:
+        # Selectbox options, kept in step with restaurants on add/delete
+        st.session_state.restaurant_names = []
+    if 'menu_df' not in st.session_state:
+        st.session_state.menu_df = pd.DataFrame(
+            columns=['id', 'restaurant_name', 'item_name', 'category', 'price', 'ingredients', 'description',
+                     'carbon_footprint', 'is_vegetarian', 'is_vegan', 'created_date', 'source', 'item_name_lc']
+        ).astype({'restaurant_name': 'category', 'category': 'category'})
     if 'categories' not in st.session_state:
         st.session_state.categories = ['Appetizers', 'Main Course', 'Desserts', 'Beverages', 'Soups', 'Salads']
     if 'orders' not in st.session_state:
         st.session_state.orders = []
     if 'customers' not in st.session_state:
-        st.session_state.customers = []
+        st.session_state.customers = pd.DataFrame(
+            columns=['id', 'name', 'email', 'phone', 'total_orders', 'lifetime_value', 'is_new', 'join_date',
+                     'last_order_date', 'preferred_restaurant', 'segment'])
     if 'marketing_campaigns' not in st.session_state:
         st.session_state.marketing_campaigns = []
-    if 'sales_data' not in st.session_state:
-        st.session_state.sales_data = []
-    if 'customer_feedback' not in st.session_state:
-        st.session_state.customer_feedback = []
+    if 'sales_df' not in st.session_state:
+        st.session_state.sales_df = pd.DataFrame(
+            columns=['id', 'date', 'item_name', 'quantity', 'price', 'amount', 'restaurant_name'])
+    if 'id_counter' not in st.session_state:
+        st.session_state.id_counter = itertools.count(1)
+
+
+def _next_id() -> int:
+    """Next id for a record that only lives in this session"""
+    return next(st.session_state.id_counter)
+
+
+def _paginate(n_rows: int, key: str, page_size: int = 20) -> slice:
+    """Render a page picker when rows overflow one page and return the slice to display"""
+    n_pages = max(1, -(-n_rows // page_size))
+    page = 1
+    if n_pages > 1:
+        # Keying on the page count resets to page 1 whenever filtering changes it
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1,
+                               key=f"{key}_page_{n_pages}")
+    start = (page - 1) * page_size
+    return slice(start, start + page_size)
 
 
 # Restaurant Management Functions
@@ -111,7 +150,7 @@ def add_restaurant():
 
         if submitted and name:
             restaurant = {
-                'id': str(uuid.uuid4()),
+                'id': _next_id(),
                 'name': name,
                 'cuisine_type': cuisine_type,
                 'address': address,
@@ -123,9 +162,9 @@ def add_restaurant():
                 'created_date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
-            st.session_state.restaurants.append(restaurant)
+            st.session_state.restaurants[restaurant['id']] = restaurant
+            st.session_state.restaurant_names.append(name)
             st.success(f"✅ Restaurant '{name}' added successfully!")
-            st.rerun()
 
 
 def view_restaurants():
@@ -137,7 +176,7 @@ def view_restaurants():
         return
 
     # Display restaurants in a nice format
-    for i, restaurant in enumerate(st.session_state.restaurants):
+    for restaurant in st.session_state.restaurants.values():
         with st.expander(f"🏪 {restaurant['name']} - {restaurant['cuisine_type']}"):
             col1, col2, col3 = st.columns(3)
 
@@ -153,9 +192,14 @@ def view_restaurants():
 
             with col3:
                 st.write(f"**Created:** {restaurant.get('created_date', 'N/A')}")
-                if st.button(f"Delete {restaurant['name']}", key=f"del_restaurant_{i}"):
-                    st.session_state.restaurants.pop(i)
-                    st.rerun()
+                st.button(f"Delete {restaurant['name']}", key=f"del_restaurant_{restaurant['id']}",
+                          on_click=_delete_restaurant, args=(restaurant['id'],))
+
+
+def _delete_restaurant(restaurant_id):
+    """Button callback: runs before the rerun, so the list renders without the deleted restaurant"""
+    del st.session_state.restaurants[restaurant_id]
+    st.session_state.restaurant_names = [r['name'] for r in st.session_state.restaurants.values()]
 
 
 # Menu Management Functions
@@ -174,8 +218,7 @@ def add_menu_item():
         col1, col2 = st.columns(2)
 
         with col1:
-            restaurant_options = [r['name'] for r in st.session_state.restaurants]
-            selected_restaurant = st.selectbox("Restaurant", restaurant_options)
+            selected_restaurant = st.selectbox("Restaurant", st.session_state.restaurant_names)
             item_name = st.text_input("Item Name*")
             category = st.selectbox("Category", st.session_state.categories)
             price = st.number_input("Price ($)", min_value=0.0, step=0.50)
@@ -199,14 +242,15 @@ def add_menu_item():
         submitted = st.form_submit_button("Add Menu Item(s)")
 
         if submitted:
-            items_added = 0
+            new_items = []
+            created_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             # Add single item
             if item_name:
                 ingredients_list = [ing.strip() for ing in ingredients.split(',') if ing.strip()]
 
                 menu_item = {
-                    'id': str(uuid.uuid4()),
+                    'id': _next_id(),
                     'restaurant_name': selected_restaurant,
                     'item_name': item_name,
                     'category': category,
@@ -216,47 +260,53 @@ def add_menu_item():
                     'carbon_footprint': carbon_footprint,
                     'is_vegetarian': is_vegetarian,
                     'is_vegan': is_vegan,
-                    'created_date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    'created_date': created_date,
                     'source': 'Manual'
                 }
 
-                st.session_state.menu_items.append(menu_item)
-                items_added += 1
+                new_items.append(menu_item)
 
             # Add bulk items
-            if bulk_items:
-                lines = bulk_items.strip().split('\n')
-                for line in lines:
-                    if ',' in line:
-                        parts = line.split(',')
-                        if len(parts) >= 2:
-                            name = parts[0].strip()
-                            try:
-                                price_val = float(parts[1].strip())
-
-                                bulk_menu_item = {
-                                    'id': str(uuid.uuid4()),
-                                    'restaurant_name': selected_restaurant,
-                                    'item_name': name,
-                                    'category': 'Other',
-                                    'price': price_val,
-                                    'ingredients': [],
-                                    'description': '',
-                                    'carbon_footprint': 0.0,
-                                    'is_vegetarian': False,
-                                    'is_vegan': False,
-                                    'created_date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                    'source': 'Bulk'
-                                }
-
-                                st.session_state.menu_items.append(bulk_menu_item)
-                                items_added += 1
-                            except ValueError:
-                                st.warning(f"Invalid price format in line: {line}")
-
-            if items_added > 0:
-                st.success(f"✅ Added {items_added} menu item(s) successfully!")
-                st.rerun()
+            if bulk_items.strip():
+                try:
+                    # Names like "N/A" or "None" are kept as text; the python engine leaves a price
+                    # field missing from a one-field line as None, apart from an empty one ("Baz,").
+                    # Fields past the price are ignored.
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('ignore', pd.errors.ParserWarning)
+                        bulk_df = pd.read_csv(io.StringIO(bulk_items), header=None, names=['item_name', 'price'],
+                                              index_col=False, dtype=str, skip_blank_lines=True,
+                                              keep_default_na=False, engine='python')
+                except ValueError:
+                    # Raised for unbalanced quotes
+                    st.warning("Could not parse bulk items, expected one 'Item Name, Price' per line.")
+                    bulk_df = pd.DataFrame(columns=['item_name', 'price'])
+
+                # Lines without a price field are skipped, lines with an empty or unparseable one are reported
+                bulk_df = bulk_df.dropna(subset=['price'])
+                bulk_df['item_name'] = bulk_df['item_name'].str.strip()
+                prices = pd.to_numeric(bulk_df['price'].str.strip(), errors='coerce')
+
+                for row in bulk_df[prices.isna()].itertuples(index=False):
+                    st.warning(f"Invalid price format in line: {row.item_name}, {row.price.strip()}")
+
+                bulk_df = bulk_df.assign(price=prices).dropna(subset=['price'])
+                new_items.extend(bulk_df.assign(
+                    id=[_next_id() for _ in range(len(bulk_df))],
+                    restaurant_name=selected_restaurant,
+                    category='Other',
+                    ingredients=[[] for _ in range(len(bulk_df))],
+                    description='',
+                    carbon_footprint=0.0,
+                    is_vegetarian=False,
+                    is_vegan=False,
+                    created_date=created_date,
+                    source='Bulk'
+                ).to_dict('records'))
+
+            if new_items:
+                _append_menu_items(new_items)
+                st.success(f"✅ Added {len(new_items)} menu item(s) successfully!")
             else:
                 st.warning("Please enter at least one menu item.")
 
@@ -265,7 +315,9 @@ def view_menu():
     """View and manage menu items"""
     st.subheader("📋 Menu Management")
 
-    if not st.session_state.menu_items:
+    menu_df = st.session_state.menu_df
+
+    if menu_df.empty:
         st.info("📝 No menu items added yet. Add your first menu item!")
         return
 
@@ -273,77 +325,103 @@ def view_menu():
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        restaurants = list(set([item['restaurant_name'] for item in st.session_state.menu_items]))
+        restaurants = menu_df['restaurant_name'].cat.categories.tolist()
         restaurant_filter = st.selectbox("Filter by Restaurant", ['All'] + restaurants)
 
     with col2:
-        categories = list(set([item['category'] for item in st.session_state.menu_items]))
+        categories = menu_df['category'].cat.categories.tolist()
         category_filter = st.selectbox("Filter by Category", ['All'] + categories)
 
     with col3:
         search_term = st.text_input("Search items")
 
-    # Filter menu items
-    filtered_items = st.session_state.menu_items
+    # Filter menu items with a single boolean mask
+    mask = np.ones(len(menu_df), dtype=bool)
 
     if restaurant_filter != 'All':
-        filtered_items = [item for item in filtered_items if item['restaurant_name'] == restaurant_filter]
+        mask &= menu_df['restaurant_name'].values == restaurant_filter
 
     if category_filter != 'All':
-        filtered_items = [item for item in filtered_items if item['category'] == category_filter]
+        mask &= menu_df['category'].values == category_filter
 
     if search_term:
-        filtered_items = [item for item in filtered_items if search_term.lower() in item['item_name'].lower()]
+        mask &= menu_df['item_name_lc'].str.contains(search_term.lower(), regex=False).values
+
+    filtered_items = menu_df[mask]
 
     # Display menu items
-    if filtered_items:
-        for i, item in enumerate(filtered_items):
-            with st.expander(f"🍽️ {item['item_name']} - ${item['price']:.2f}"):
+    if not filtered_items.empty:
+        st.dataframe(filtered_items[['item_name', 'restaurant_name', 'category', 'price']],
+                     use_container_width=True, hide_index=True,
+                     column_config={'price': st.column_config.NumberColumn(format="$%.2f")})
+
+        for item in filtered_items.iloc[_paginate(len(filtered_items), "menu")].itertuples(index=False):
+            with st.expander(f"🍽️ {item.item_name} - ${item.price:.2f}"):
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
-                    st.write(f"**Restaurant:** {item['restaurant_name']}")
-                    st.write(f"**Category:** {item['category']}")
-                    st.write(f"**Price:** ${item['price']:.2f}")
+                    st.write(f"**Restaurant:** {item.restaurant_name}")
+                    st.write(f"**Category:** {item.category}")
+                    st.write(f"**Price:** ${item.price:.2f}")
 
                 with col2:
-                    st.write(f"**Carbon Footprint:** {item['carbon_footprint']:.2f} kg CO₂e")
-                    veg_status = "🌱 Vegetarian" if item.get('is_vegetarian') else ""
-                    vegan_status = "🌿 Vegan" if item.get('is_vegan') else ""
+                    st.write(f"**Carbon Footprint:** {item.carbon_footprint:.2f} kg CO₂e")
+                    veg_status = "🌱 Vegetarian" if item.is_vegetarian else ""
+                    vegan_status = "🌿 Vegan" if item.is_vegan else ""
                     if veg_status or vegan_status:
                         st.write(f"{veg_status} {vegan_status}")
 
                 with col3:
-                    st.write(f"**Source:** {item.get('source', 'Unknown')}")
-                    st.write(f"**Created:** {item['created_date']}")
+                    st.write(f"**Source:** {item.source}")
+                    st.write(f"**Created:** {item.created_date}")
 
-                if item.get('ingredients'):
-                    st.write(f"**Ingredients:** {', '.join(item['ingredients'])}")
+                if item.ingredients:
+                    st.write(f"**Ingredients:** {', '.join(item.ingredients)}")
 
-                if item.get('description'):
-                    st.write(f"**Description:** {item['description']}")
+                if item.description:
+                    st.write(f"**Description:** {item.description}")
 
-                if st.button(f"Delete {item['item_name']}", key=f"del_item_{item['id']}"):
-                    st.session_state.menu_items = [mi for mi in st.session_state.menu_items if mi['id'] != item['id']]
-                    st.rerun()
+                st.button(f"Delete {item.item_name}", key=f"del_item_{item.id}",
+                          on_click=_delete_menu_item, args=(item.id,))
     else:
         st.info("No menu items match your filters.")
 
 
+def _append_menu_items(records: List[Dict]):
+    """Append menu item records to the menu frame, keeping its categorical columns"""
+    new_df = pd.DataFrame(records)
+    # Lowercased once here so the search box doesn't re-lower every name on each keystroke
+    new_df['item_name_lc'] = new_df['item_name'].str.lower()
+    menu_df = pd.concat([st.session_state.menu_df, new_df], ignore_index=True)
+    st.session_state.menu_df = menu_df.astype({'restaurant_name': 'category', 'category': 'category'})
+
+
+def _delete_menu_item(item_id):
+    """Button callback: drop a menu item by id, pruning filter options nobody uses any more"""
+    menu_df = st.session_state.menu_df
+    menu_df = menu_df[menu_df['id'] != item_id]
+    st.session_state.menu_df = menu_df.assign(
+        restaurant_name=menu_df['restaurant_name'].cat.remove_unused_categories(),
+        category=menu_df['category'].cat.remove_unused_categories()
+    )
+
+
 # Sales Management Functions
 def sales_dashboard():
     """Sales analytics dashboard"""
     st.subheader("📊 Sales Dashboard")
 
     # Generate sample sales data if empty
-    if not st.session_state.sales_data:
+    if st.session_state.sales_df.empty:
         generate_sample_sales_data()
 
+    df = st.session_state.sales_df
+
     # Sales metrics
     col1, col2, col3, col4 = st.columns(4)
 
-    total_sales = sum([sale['amount'] for sale in st.session_state.sales_data])
-    total_orders = len(st.session_state.sales_data)
+    total_sales = df['amount'].sum()
+    total_orders = len(df)
     avg_order_value = total_sales / total_orders if total_orders > 0 else 0
 
     with col1:
@@ -363,65 +441,76 @@ def sales_dashboard():
     st.markdown("---")
 
     # Sales chart
-    if st.session_state.sales_data:
-        df = pd.DataFrame(st.session_state.sales_data)
-        df['date'] = pd.to_datetime(df['date'])
-
+    if not df.empty:
         # Daily sales
-        daily_sales = df.groupby(df['date'].dt.date)['amount'].sum().reset_index()
-        daily_sales.columns = ['Date', 'Sales']
-
         st.subheader("📈 Daily Sales Trend")
-        st.line_chart(daily_sales.set_index('Date'))
+        st.line_chart(_daily_sales(df))
 
         # Top selling items
         if 'item_name' in df.columns:
             st.subheader("🏆 Top Selling Items")
-            top_items = df.groupby('item_name')['quantity'].sum().sort_values(ascending=False).head(5)
-            st.bar_chart(top_items)
+            st.bar_chart(_top_items(df))
+
+
+@st.cache_data
+def _daily_sales(df: pd.DataFrame) -> pd.DataFrame:
+    """Total sales per day; cached on the sales frame's contents"""
+    daily_sales = df.groupby(df['date'].dt.normalize())['amount'].sum().reset_index()
+    daily_sales.columns = ['Date', 'Sales']
+    return daily_sales.set_index('Date')
+
+
+@st.cache_data
+def _top_items(df: pd.DataFrame, n: int = 5) -> pd.Series:
+    """Best-selling items by quantity; cached on the sales frame's contents"""
+    return df.groupby('item_name')['quantity'].sum().sort_values(ascending=False).head(n)
 
 
 def generate_sample_sales_data():
     """Generate sample sales data for demonstration"""
-    sample_data = []
-
     # Get some menu items for realistic data
-    menu_items = st.session_state.menu_items
-    if not menu_items:
+    menu_df = st.session_state.menu_df
+    if not menu_df.empty:
+        menu = tuple(zip(menu_df['item_name'], menu_df['price']))
+    else:
         # Create some default items
-        menu_items = [
-            {'item_name': 'Margherita Pizza', 'price': 12.99},
-            {'item_name': 'Caesar Salad', 'price': 8.99},
-            {'item_name': 'Pasta Carbonara', 'price': 14.99},
-            {'item_name': 'Grilled Chicken', 'price': 16.99},
-            {'item_name': 'Chocolate Cake', 'price': 6.99}
-        ]
-
-    # Generate 30 days of sample data
-    for i in range(30):
-        date = datetime.datetime.now() - datetime.timedelta(days=i)
-
-        # Random number of orders per day
-        orders_per_day = random.randint(5, 25)
-
-        for _ in range(orders_per_day):
-            item = random.choice(menu_items)
-            quantity = random.randint(1, 3)
-
-            sale = {
-                'id': str(uuid.uuid4()),
-                'date': date.strftime("%Y-%m-%d"),
-                'item_name': item['item_name'],
-                'quantity': quantity,
-                'price': item['price'],
-                'amount': item['price'] * quantity,
-                'restaurant_name': st.session_state.restaurants[0][
-                    'name'] if st.session_state.restaurants else 'Demo Restaurant'
-            }
+        menu = (
+            ('Margherita Pizza', 12.99),
+            ('Caesar Salad', 8.99),
+            ('Pasta Carbonara', 14.99),
+            ('Grilled Chicken', 16.99),
+            ('Chocolate Cake', 6.99)
+        )
+
+    restaurant_name = next(iter(st.session_state.restaurants.values()), {'name': 'Demo Restaurant'})['name']
+    st.session_state.sales_df = _build_sample_sales(menu, restaurant_name)
+
+
+@st.cache_data(ttl=3600)
+def _build_sample_sales(menu: Tuple[Tuple[str, float], ...], restaurant_name: str, seed: int = 0) -> pd.DataFrame:
+    """Build sample sales rows; cached on the (hashable) menu and restaurant name"""
+    rng = np.random.default_rng(seed)
+    item_names = np.array([name for name, _ in menu], dtype=object)
+    item_prices = np.array([price for _, price in menu], dtype=float)
 
-            sample_data.append(sale)
+    # Generate 30 days of sample data, a random number of orders per day
+    orders_per_day = rng.integers(5, 26, size=30)
+    total = int(orders_per_day.sum())
+    day_offsets = np.repeat(np.arange(30), orders_per_day)
 
-    st.session_state.sales_data = sample_data
+    item_idx = rng.integers(0, len(menu), total)
+    quantity = rng.integers(1, 4, total)
+    price = item_prices[item_idx]
+
+    return pd.DataFrame({
+        'id': np.arange(total),
+        'date': pd.Timestamp.now().normalize() - pd.to_timedelta(day_offsets, unit='D'),
+        'item_name': item_names[item_idx],
+        'quantity': quantity,
+        'price': price,
+        'amount': price * quantity,
+        'restaurant_name': restaurant_name
+    })
 
 
 # Marketing Functions
@@ -461,7 +550,7 @@ def marketing_campaigns():
 
             if submitted and campaign_name:
                 campaign = {
-                    'id': str(uuid.uuid4()),
+                    'id': _next_id(),
                     'name': campaign_name,
                     'type': campaign_type,
                     'target_audience': target_audience,
@@ -481,11 +570,11 @@ def marketing_campaigns():
 
                 st.session_state.marketing_campaigns.append(campaign)
                 st.success(f"✅ Campaign '{campaign_name}' launched successfully!")
-                st.rerun()
 
     with tab2:
         if st.session_state.marketing_campaigns:
-            for campaign in st.session_state.marketing_campaigns:
+            campaigns = st.session_state.marketing_campaigns
+            for campaign in campaigns[_paginate(len(campaigns), "campaigns")]:
                 with st.expander(f"📢 {campaign['name']} - {campaign['status']}"):
                     col1, col2, col3 = st.columns(3)
 
@@ -515,25 +604,8 @@ def marketing_campaigns():
         st.markdown("### Campaign Performance Analytics")
 
         if st.session_state.marketing_campaigns:
-            # Generate mock performance data
-            performance_data = []
-            for campaign in st.session_state.marketing_campaigns:
-                # Mock data - in real app this would come from actual analytics
-                impressions = np.random.randint(1000, 10000)
-                clicks = np.random.randint(50, impressions // 10)
-                conversions = np.random.randint(5, clicks // 5)
-
-                performance_data.append({
-                    'Campaign': campaign['name'],
-                    'Impressions': impressions,
-                    'Clicks': clicks,
-                    'Conversions': conversions,
-                    'CTR': f"{(clicks / impressions * 100):.2f}%",
-                    'Conversion Rate': f"{(conversions / clicks * 100):.2f}%",
-                    'Cost': f"${campaign['budget']:.2f}"
-                })
-
-            df = pd.DataFrame(performance_data)
+            df = _campaign_performance(tuple((c['id'], c['name'], c['budget'])
+                                             for c in st.session_state.marketing_campaigns))
             st.dataframe(df, use_container_width=True)
 
             # Performance charts
@@ -552,6 +624,30 @@ def marketing_campaigns():
             st.info("No campaign performance data available.")
 
 
+@st.cache_data
+def _campaign_performance(campaigns: Tuple[Tuple[int, str, float], ...]) -> pd.DataFrame:
+    """Mock performance data; seeded per campaign id so the numbers don't change between reruns"""
+    performance_data = []
+    for campaign_id, name, budget in campaigns:
+        # Mock data - in real app this would come from actual analytics
+        rng = np.random.default_rng(campaign_id)
+        impressions = int(rng.integers(1000, 10000))
+        clicks = int(rng.integers(50, impressions // 10))
+        conversions = int(rng.integers(5, clicks // 5))
+
+        performance_data.append({
+            'Campaign': name,
+            'Impressions': impressions,
+            'Clicks': clicks,
+            'Conversions': conversions,
+            'CTR': f"{(clicks / impressions * 100):.2f}%",
+            'Conversion Rate': f"{(conversions / clicks * 100):.2f}%",
+            'Cost': f"${budget:.2f}"
+        })
+
+    return pd.DataFrame(performance_data)
+
+
 # Customer Management Functions
 def customer_management():
     """Customer relationship management"""
@@ -561,18 +657,18 @@ def customer_management():
 
     with tab1:
         # Generate sample customer data if empty
-        if not st.session_state.customers:
+        if st.session_state.customers.empty:
             generate_sample_customer_data()
 
+        customers = st.session_state.customers
+
         # Customer metrics
         col1, col2, col3, col4 = st.columns(4)
 
-        total_customers = len(st.session_state.customers)
-        new_customers = len([c for c in st.session_state.customers if c.get('is_new', False)])
-        avg_orders = sum([c.get('total_orders', 0) for c in
-                          st.session_state.customers]) / total_customers if total_customers > 0 else 0
-        avg_value = sum([c.get('lifetime_value', 0) for c in
-                         st.session_state.customers]) / total_customers if total_customers > 0 else 0
+        total_customers = len(customers)
+        new_customers = int(customers['is_new'].sum())
+        avg_orders = customers['total_orders'].mean() if total_customers > 0 else 0
+        avg_value = customers['lifetime_value'].mean() if total_customers > 0 else 0
 
         with col1:
             st.metric("👥 Total Customers", f"{total_customers:,}")
@@ -587,30 +683,19 @@ def customer_management():
             st.metric("💰 Avg Lifetime Value", f"${avg_value:.2f}")
 
         # Customer segmentation
-        if st.session_state.customers:
+        if not customers.empty:
             st.subheader("📊 Customer Segmentation")
 
             # Segment by order frequency
-            segments = {'New': 0, 'Regular': 0, 'VIP': 0, 'Inactive': 0}
-
-            for customer in st.session_state.customers:
-                orders = customer.get('total_orders', 0)
-                if orders == 0:
-                    segments['Inactive'] += 1
-                elif orders <= 2:
-                    segments['New'] += 1
-                elif orders <= 10:
-                    segments['Regular'] += 1
-                else:
-                    segments['VIP'] += 1
-
-            segment_df = pd.DataFrame(list(segments.items()), columns=['Segment', 'Count'])
-            st.bar_chart(segment_df.set_index('Segment'))
+            segments = customers['segment'].value_counts().reindex(['New', 'Regular', 'VIP', 'Inactive'], fill_value=0)
+            st.bar_chart(segments.rename_axis('Segment').to_frame('Count'))
 
     with tab2:
         st.markdown("### Customer Database")
 
-        if st.session_state.customers:
+        customers = st.session_state.customers
+
+        if not customers.empty:
             # Search and filter
             col1, col2 = st.columns(2)
 
@@ -620,27 +705,32 @@ def customer_management():
             with col2:
                 segment_filter = st.selectbox("Filter by Segment", ['All', 'New', 'Regular', 'VIP', 'Inactive'])
 
-            # Display customers
-            filtered_customers = st.session_state.customers
+            # Filter customers with a single boolean mask
+            mask = np.ones(len(customers), dtype=bool)
 
             if search_customer:
-                filtered_customers = [c for c in filtered_customers if search_customer.lower() in c['name'].lower()]
-
-            for customer in filtered_customers[:10]:  # Show first 10
-                with st.expander(f"👤 {customer['name']} - {customer.get('email', 'No email')}"):
-                    col1, col2, col3 = st.columns(3)
-
-                    with col1:
-                        st.write(f"**Phone:** {customer.get('phone', 'N/A')}")
-                        st.write(f"**Total Orders:** {customer.get('total_orders', 0)}")
-
-                    with col2:
-                        st.write(f"**Lifetime Value:** ${customer.get('lifetime_value', 0):.2f}")
-                        st.write(f"**Last Order:** {customer.get('last_order_date', 'Never')}")
-
-                    with col3:
-                        st.write(f"**Preferred Restaurant:** {customer.get('preferred_restaurant', 'N/A')}")
-                        st.write(f"**Customer Since:** {customer.get('join_date', 'N/A')}")
+                mask &= customers['name'].str.contains(search_customer, case=False, regex=False).values
+
+            if segment_filter != 'All':
+                mask &= customers['segment'].values == segment_filter
+
+            filtered_customers = customers[mask]
+
+            st.dataframe(
+                filtered_customers[['name', 'email', 'phone', 'total_orders', 'lifetime_value', 'last_order_date',
+                                    'preferred_restaurant', 'join_date']],
+                use_container_width=True, hide_index=True, height=400,
+                column_config={
+                    'name': "Name",
+                    'email': "Email",
+                    'phone': "Phone",
+                    'total_orders': "Total Orders",
+                    'lifetime_value': st.column_config.NumberColumn("Lifetime Value", format="$%.2f"),
+                    'last_order_date': st.column_config.DateColumn("Last Order", format="YYYY-MM-DD"),
+                    'preferred_restaurant': "Preferred Restaurant",
+                    'join_date': st.column_config.DateColumn("Customer Since", format="YYYY-MM-DD")
+                }
+            )
         else:
             st.info("No customer data available.")
 
@@ -678,36 +768,49 @@ def customer_management():
 
 def generate_sample_customer_data():
     """Generate sample customer data"""
-    sample_customers = []
-    first_names = ["John", "Jane", "Mike", "Sarah", "David", "Lisa", "Chris", "Emma", "Alex", "Maria"]
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
-                  "Martinez"]
-
-    for i in range(50):
-        name = f"{random.choice(first_names)} {random.choice(last_names)}"
-
-        customer = {
-            'id': str(uuid.uuid4()),
-            'name': name,
-            'email': f"{name.lower().replace(' ', '.')}@email.com",
-            'phone': f"+1-{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-            'total_orders': random.randint(0, 25),
-            'lifetime_value': random.uniform(50, 1000),
-            'is_new': random.choice([True, False]),
-            'join_date': (datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 365))).strftime(
-                "%Y-%m-%d"),
-            'last_order_date': (datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30))).strftime(
-                "%Y-%m-%d"),
-            'preferred_restaurant': st.session_state.restaurants[0][
-                'name'] if st.session_state.restaurants else 'Demo Restaurant'
-        }
-
-        sample_customers.append(customer)
-
-    st.session_state.customers = sample_customers
-
-
-# QR Code Generator
+    restaurant_name = next(iter(st.session_state.restaurants.values()), {'name': 'Demo Restaurant'})['name']
+    st.session_state.customers = _build_sample_customers(restaurant_name)
+
+
+@st.cache_data(ttl=3600)
+def _build_sample_customers(restaurant_name: str, seed: int = 0, n: int = 50) -> pd.DataFrame:
+    """Build sample customer records; cached on the preferred restaurant name"""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now().normalize()
+    first_names = np.array(["John", "Jane", "Mike", "Sarah", "David", "Lisa", "Chris", "Emma", "Alex", "Maria"],
+                           dtype=object)
+    last_names = np.array(["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+                           "Martinez"], dtype=object)
+
+    names = pd.Series(first_names[rng.integers(0, len(first_names), n)] + " " +
+                      last_names[rng.integers(0, len(last_names), n)])
+    phones = ("+1-" + pd.Series(rng.integers(100, 1000, n)).astype(str) +
+              "-" + pd.Series(rng.integers(100, 1000, n)).astype(str) +
+              "-" + pd.Series(rng.integers(1000, 10000, n)).astype(str))
+
+    total_orders = rng.integers(0, 26, n)
+
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'name': names,
+        'email': names.str.lower().str.replace(' ', '.', regex=False) + "@email.com",
+        'phone': phones,
+        'total_orders': total_orders,
+        'lifetime_value': rng.uniform(50, 1000, n),
+        'is_new': rng.random(n) < 0.5,
+        'join_date': today - pd.to_timedelta(rng.integers(1, 366, n), unit='D'),
+        'last_order_date': today - pd.to_timedelta(rng.integers(1, 31, n), unit='D'),
+        'preferred_restaurant': restaurant_name,
+        'segment': _segment_customers(total_orders)
+    })
+
+
+def _segment_customers(total_orders) -> pd.Categorical:
+    """Bucket order counts into Inactive (0), New (1-2), Regular (3-10) and VIP (11+)"""
+    return pd.Categorical.from_codes(np.searchsorted([0, 2, 10], total_orders),
+                                     categories=['Inactive', 'New', 'Regular', 'VIP'])
+
+
 def generate_qr_code():
     """Generate QR codes for restaurants"""
     st.subheader("📱 QR Code Generator")
@@ -716,8 +819,7 @@ def generate_qr_code():
         st.warning("⚠️ Please add a restaurant first!")
         return
 
-    restaurant_options = [r['name'] for r in st.session_state.restaurants]
-    selected_restaurant = st.selectbox("Select Restaurant", restaurant_options)
+    selected_restaurant = st.selectbox("Select Restaurant", st.session_state.restaurant_names)
 
     # QR Code options
     qr_type = st.selectbox("QR Code Type", ["Menu", "Website", "Contact Info", "Feedback Form"])
@@ -727,30 +829,22 @@ def generate_qr_code():
     elif qr_type == "Website":
         url = st.text_input("Website URL", "https://your-restaurant-website.com")
     elif qr_type == "Contact Info":
-        restaurant = next(r for r in st.session_state.restaurants if r['name'] == selected_restaurant)
+        restaurant = next(r for r in st.session_state.restaurants.values() if r['name'] == selected_restaurant)
         url = f"tel:{restaurant.get('phone', '')}"
     else:  # Feedback Form
         url = f"https://feedback.restaurant-app.com/{selected_restaurant.lower().replace(' ', '-')}"
 
     if st.button("🔗 Generate QR Code"):
         try:
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(url)
-            qr.make(fit=True)
-
-            qr_image = qr.make_image(fill_color="black", back_color="white")
+            qr_png = _qr_png(url)
 
             # Display QR code
-            st.image(qr_image, caption=f"QR Code for {selected_restaurant}", width=300)
+            st.image(qr_png, caption=f"QR Code for {selected_restaurant}", width=300)
 
             # Download button
-            img_buffer = io.BytesIO()
-            qr_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-
             st.download_button(
                 label="📥 Download QR Code",
-                data=img_buffer,
+                data=qr_png,
                 file_name=f"{selected_restaurant}_{qr_type}_QR.png",
                 mime="image/png"
             )
@@ -761,138 +855,263 @@ def generate_qr_code():
             st.error(f"Error generating QR code: {str(e)}")
 
 
+@st.cache_data(max_entries=64)
+def _qr_png(url: str, box_size: int = 10, border: int = 5) -> bytes:
+    """PNG bytes of the QR code for a URL; cached since the image depends on nothing else"""
+    # Only the QR page needs these, so the other pages never load them
+    import qrcode
+    from PIL import Image
+
+    qr = qrcode.QRCode(version=1, box_size=box_size, border=border)
+    qr.add_data(url)
+    qr.make(fit=True)
+
+    # Rasterize the module matrix (border included) in one NumPy pass instead of
+    # having PIL draw every module; white is True in a 1-bit image
+    white = ~np.array(qr.get_matrix(), dtype=bool)
+    qr_image = Image.fromarray(white.repeat(box_size, axis=0).repeat(box_size, axis=1))
+    img_buffer = io.BytesIO()
+    qr_image.save(img_buffer, format='PNG')
+    return img_buffer.getvalue()
+
+
 # Feedback Management
 def feedback_management():
     """Customer feedback and review management"""
     st.subheader("💬 Customer Feedback")
 
+    feedback_tabs()
+
+
+@st.fragment
+def feedback_tabs():
+    """Feedback tabs as one fragment: submitting the form reruns only these, not the whole app"""
     tab1, tab2, tab3 = st.tabs(["📝 Feedback Form", "⭐ Reviews", "📊 Analytics"])
 
     with tab1:
-        st.markdown("### Customer Feedback Form")
+        feedback_form()
 
-        with st.form("feedback_form"):
-            col1, col2 = st.columns(2)
+    with tab2:
+        recent_reviews()
 
-            with col1:
-                customer_name = st.text_input("Name (Optional)")
-                customer_email = st.text_input("Email (Optional)")
-                restaurant = st.selectbox("Restaurant", [r['name'] for r in
-                                                         st.session_state.restaurants] if st.session_state.restaurants else [
-                    'Demo Restaurant'])
+    with tab3:
+        feedback_analytics_view()
 
-            with col2:
-                visit_date = st.date_input("Visit Date")
-                rating = st.select_slider("Overall Rating", options=[1, 2, 3, 4, 5], value=5,
-                                          format_func=lambda x: "⭐" * x)
-                order_type = st.selectbox("Order Type", ["Dine-in", "Takeout", "Delivery"])
 
-            # Detailed ratings
-            st.markdown("#### Detailed Ratings")
-            col1, col2, col3 = st.columns(3)
+def feedback_form():
+    """Customer feedback form"""
+    st.markdown("### Customer Feedback Form")
 
-            with col1:
-                food_rating = st.select_slider("Food Quality", options=[1, 2, 3, 4, 5], value=5,
-                                               format_func=lambda x: "⭐" * x)
+    with st.form("feedback_form"):
+        col1, col2 = st.columns(2)
 
-            with col2:
-                service_rating = st.select_slider("Service", options=[1, 2, 3, 4, 5], value=5,
-                                                  format_func=lambda x: "⭐" * x)
+        with col1:
+            customer_name = st.text_input("Name (Optional)")
+            customer_email = st.text_input("Email (Optional)")
+            restaurant = st.selectbox("Restaurant", st.session_state.restaurant_names or ['Demo Restaurant'])
 
-            with col3:
-                atmosphere_rating = st.select_slider("Atmosphere", options=[1, 2, 3, 4, 5], value=5,
-                                                     format_func=lambda x: "⭐" * x)
-
-            comments = st.text_area("Comments and Suggestions")
-
-            submitted = st.form_submit_button("📝 Submit Feedback")
-
-            if submitted:
-                feedback = {
-                    'id': str(uuid.uuid4()),
-                    'customer_name': customer_name or 'Anonymous',
-                    'customer_email': customer_email,
-                    'restaurant': restaurant,
-                    'visit_date': visit_date.strftime("%Y-%m-%d"),
-                    'overall_rating': rating,
-                    'food_rating': food_rating,
-                    'service_rating': service_rating,
-                    'atmosphere_rating': atmosphere_rating,
-                    'order_type': order_type,
-                    'comments': comments,
-                    'submitted_date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
+        with col2:
+            visit_date = st.date_input("Visit Date")
+            rating = st.select_slider("Overall Rating", options=[1, 2, 3, 4, 5], value=5,
+                                      format_func=STARS.__getitem__)
+            order_type = st.selectbox("Order Type", ["Dine-in", "Takeout", "Delivery"])
 
-                st.session_state.customer_feedback.append(feedback)
-                st.success("✅ Thank you for your feedback!")
-                st.rerun()
+        # Detailed ratings
+        st.markdown("#### Detailed Ratings")
+        col1, col2, col3 = st.columns(3)
 
-    with tab2:
-        if st.session_state.customer_feedback:
-            st.markdown("### Recent Reviews")
+        with col1:
+            food_rating = st.select_slider("Food Quality", options=[1, 2, 3, 4, 5], value=5,
+                                           format_func=STARS.__getitem__)
 
-            for feedback in st.session_state.customer_feedback[-10:]:  # Show last 10
-                with st.expander(
-                        f"⭐ {feedback['overall_rating']}/5 - {feedback['customer_name']} - {feedback['visit_date']}"):
-                    col1, col2 = st.columns(2)
+        with col2:
+            service_rating = st.select_slider("Service", options=[1, 2, 3, 4, 5], value=5,
+                                              format_func=STARS.__getitem__)
 
-                    with col1:
-                        st.write(f"**Restaurant:** {feedback['restaurant']}")
-                        st.write(f"**Order Type:** {feedback['order_type']}")
-                        st.write(f"**Overall Rating:** {'⭐' * feedback['overall_rating']}")
+        with col3:
+            atmosphere_rating = st.select_slider("Atmosphere", options=[1, 2, 3, 4, 5], value=5,
+                                                 format_func=STARS.__getitem__)
 
-                    with col2:
-                        st.write(f"**Food:** {'⭐' * feedback['food_rating']}")
-                        st.write(f"**Service:** {'⭐' * feedback['service_rating']}")
-                        st.write(f"**Atmosphere:** {'⭐' * feedback['atmosphere_rating']}")
+        comments = st.text_area("Comments and Suggestions")
 
-                    if feedback['comments']:
-                        st.write(f"**Comments:** {feedback['comments']}")
-        else:
-            st.info("No feedback received yet.")
+        submitted = st.form_submit_button("📝 Submit Feedback")
 
-    with tab3:
-        if st.session_state.customer_feedback:
-            st.markdown("### Feedback Analytics")
+        if submitted:
+            _insert_feedback({
+                'customer_name': customer_name or 'Anonymous',
+                'customer_email': customer_email,
+                'restaurant': restaurant,
+                'visit_date': visit_date.isoformat(),
+                'overall_rating': rating,
+                'food_rating': food_rating,
+                'service_rating': service_rating,
+                'atmosphere_rating': atmosphere_rating,
+                'order_type': order_type,
+                'comments': comments,
+                'submitted_ts': datetime.datetime.now().timestamp()
+            })
+            st.success("✅ Thank you for your feedback!")
+
+
+def recent_reviews():
+    """Latest customer reviews"""
+    # Newest ten by primary key, shown oldest first
+    reviews = _query_feedback(
+        "SELECT visit_date, customer_name, restaurant, overall_rating, food_rating, service_rating, "
+        "atmosphere_rating, order_type, comments FROM feedback ORDER BY id DESC LIMIT 10")[::-1]
+
+    if reviews:
+        st.markdown("### Recent Reviews")
+
+        # One table for all ten rather than an expander of writes per review
+        st.dataframe(
+            pd.DataFrame([tuple(review) for review in reviews], columns=reviews[0].keys()),
+            use_container_width=True, hide_index=True,
+            column_config={
+                'visit_date': "Visit Date",
+                'customer_name': "Customer",
+                'restaurant': "Restaurant",
+                'overall_rating': st.column_config.NumberColumn("Overall", format="⭐ %d/5"),
+                'food_rating': st.column_config.NumberColumn("Food", format="⭐ %d/5"),
+                'service_rating': st.column_config.NumberColumn("Service", format="⭐ %d/5"),
+                'atmosphere_rating': st.column_config.NumberColumn("Atmosphere", format="⭐ %d/5"),
+                'order_type': "Order Type",
+                'comments': "Comments"
+            }
+        )
+    else:
+        st.info("No feedback received yet.")
 
-            df = pd.DataFrame(st.session_state.customer_feedback)
 
-            # Overall metrics
-            col1, col2, col3, col4 = st.columns(4)
+def feedback_analytics_view():
+    """Aggregate feedback metrics and charts"""
+    summary = _feedback_summary()
 
-            with col1:
-                avg_rating = df['overall_rating'].mean()
-                st.metric("📊 Average Rating", f"{avg_rating:.1f}/5")
+    if summary:
+        st.markdown("### Feedback Analytics")
 
-            with col2:
-                total_feedback = len(df)
-                st.metric("💬 Total Feedback", f"{total_feedback}")
+        stats = _feedback_analytics(summary)
 
-            with col3:
-                positive_feedback = len(df[df['overall_rating'] >= 4])
-                positive_rate = (positive_feedback / total_feedback * 100) if total_feedback > 0 else 0
-                st.metric("👍 Positive Rate", f"{positive_rate:.1f}%")
-
-            with col4:
-                recent_feedback = len(
-                    df[pd.to_datetime(df['submitted_date']) >= (datetime.datetime.now() - datetime.timedelta(days=7))])
-                st.metric("📅 This Week", f"{recent_feedback}")
-
-            # Rating distribution
-            st.subheader("⭐ Rating Distribution")
-            rating_counts = df['overall_rating'].value_counts().sort_index()
-            st.bar_chart(rating_counts)
-
-            # Category ratings
-            st.subheader("📊 Category Ratings")
-            category_avg = pd.DataFrame({
-                'Food': [df['food_rating'].mean()],
-                'Service': [df['service_rating'].mean()],
-                'Atmosphere': [df['atmosphere_rating'].mean()]
-            })
-            st.bar_chart(category_avg.T)
-        else:
-            st.info("No feedback data available for analytics.")
+        # Overall metrics
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric("📊 Average Rating", f"{stats['avg_rating']:.1f}/5")
+
+        with col2:
+            st.metric("💬 Total Feedback", f"{stats['total_feedback']}")
+
+        with col3:
+            st.metric("👍 Positive Rate", f"{stats['positive_rate']:.1f}%")
+
+        with col4:
+            # Depends on the clock, so it stays out of the cache; a range scan on the submitted_ts index
+            week_ago = (datetime.datetime.now() - datetime.timedelta(days=7)).timestamp()
+            recent_feedback = _query_feedback(
+                "SELECT COUNT(*) FROM feedback WHERE submitted_ts >= ?", (week_ago,))[0][0]
+            st.metric("📅 This Week", f"{recent_feedback}")
+
+        # Rating distribution
+        st.subheader("⭐ Rating Distribution")
+        st.bar_chart(stats['rating_counts'])
+
+        # Category ratings
+        st.subheader("📊 Category Ratings")
+        st.bar_chart(stats['category_avg'])
+    else:
+        st.info("No feedback data available for analytics.")
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _feedback_analytics(summary: Tuple[Tuple[int, ...], ...]) -> Dict:
+    """Derive the feedback metrics from a summary snapshot; at most five rows, so it is also a cheap cache key"""
+    totals = np.array(summary, dtype=np.int64)
+    ratings, counts = totals[:, 0], totals[:, 1]
+
+    total_feedback = int(counts.sum())
+    positive_feedback = int(counts[ratings >= 4].sum())
+
+    return {
+        'avg_rating': (ratings @ counts) / total_feedback,
+        'total_feedback': total_feedback,
+        'positive_rate': (positive_feedback / total_feedback * 100) if total_feedback > 0 else 0,
+        'rating_counts': pd.Series(counts, index=pd.Index(ratings, name='overall_rating'), name='count'),
+        'category_avg': pd.Series(totals[:, 2:].sum(axis=0) / total_feedback,
+                                  index=['Food', 'Service', 'Atmosphere'])
+    }
+
+
+@st.cache_resource
+def _feedback_db() -> Tuple[sqlite3.Connection, threading.Lock]:
+    """One SQLite connection for the whole server; sessions run on their own threads, so access is locked"""
+    conn = sqlite3.connect(FEEDBACK_DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # The CHECK constraints reject out-of-range ratings, which would break the STARS lookups
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT,
+            customer_email TEXT,
+            restaurant TEXT,
+            visit_date TEXT,
+            overall_rating INTEGER NOT NULL CHECK (overall_rating BETWEEN 1 AND 5),
+            food_rating INTEGER NOT NULL CHECK (food_rating BETWEEN 1 AND 5),
+            service_rating INTEGER NOT NULL CHECK (service_rating BETWEEN 1 AND 5),
+            atmosphere_rating INTEGER NOT NULL CHECK (atmosphere_rating BETWEEN 1 AND 5),
+            order_type TEXT,
+            comments TEXT,
+            submitted_ts REAL
+        );
+        CREATE INDEX IF NOT EXISTS feedback_submitted_ts ON feedback (submitted_ts);
+
+        -- Running count and category totals per overall rating, kept in step by _insert_feedback
+        CREATE TABLE IF NOT EXISTS feedback_summary (
+            overall_rating INTEGER PRIMARY KEY,
+            feedback_count INTEGER NOT NULL,
+            food_total INTEGER NOT NULL,
+            service_total INTEGER NOT NULL,
+            atmosphere_total INTEGER NOT NULL
+        );
+        -- Backfill a database written before the summary existed
+        INSERT INTO feedback_summary
+            SELECT overall_rating, COUNT(*), SUM(food_rating), SUM(service_rating), SUM(atmosphere_rating)
+            FROM feedback WHERE NOT EXISTS (SELECT 1 FROM feedback_summary) GROUP BY overall_rating;
+    """)
+    return conn, threading.Lock()
+
+
+def _query_feedback(sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+    """Run a read against the feedback database"""
+    conn, lock = _feedback_db()
+    with lock:
+        return conn.execute(sql, params).fetchall()
+
+
+def _insert_feedback(feedback: Dict):
+    """Append one submission and fold it into the summary in the same transaction; the row id is the feedback id"""
+    conn, lock = _feedback_db()
+    with lock, conn:
+        conn.execute(
+            "INSERT INTO feedback (customer_name, customer_email, restaurant, visit_date, overall_rating, "
+            "food_rating, service_rating, atmosphere_rating, order_type, comments, submitted_ts) "
+            "VALUES (:customer_name, :customer_email, :restaurant, :visit_date, :overall_rating, "
+            ":food_rating, :service_rating, :atmosphere_rating, :order_type, :comments, :submitted_ts)",
+            feedback)
+        conn.execute(
+            "INSERT INTO feedback_summary "
+            "VALUES (:overall_rating, 1, :food_rating, :service_rating, :atmosphere_rating) "
+            "ON CONFLICT (overall_rating) DO UPDATE SET feedback_count = feedback_count + 1, "
+            "food_total = food_total + excluded.food_total, "
+            "service_total = service_total + excluded.service_total, "
+            "atmosphere_total = atmosphere_total + excluded.atmosphere_total",
+            feedback)
+
+
+def _feedback_summary() -> Tuple[Tuple[int, ...], ...]:
+    """Per-rating (rating, count, food, service, atmosphere totals) rows, read in one query so they agree"""
+    return tuple(tuple(row) for row in _query_feedback(
+        "SELECT overall_rating, feedback_count, food_total, service_total, atmosphere_total "
+        "FROM feedback_summary ORDER BY overall_rating"))
 
 
 # Main Application
@@ -900,72 +1119,40 @@ def main():
     """Main application function"""
     initialize_session_state()
 
+    # Streamlit drops any element a rerun doesn't emit, so the stylesheet has to go out on every run
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
     # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>🍕 Restaurant Sales & Marketing System</h1>
-        <p>Complete solution for restaurant management, sales tracking, and marketing automation</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Sidebar navigation
-    st.sidebar.title("🧭 Navigation")
-
-    pages = {
-        "🏠 Dashboard": "dashboard",
-        "🏪 Restaurant Management": "restaurants",
-        "📋 Menu Management": "menu",
-        "📊 Sales Analytics": "sales",
-        "📢 Marketing Campaigns": "marketing",
-        "👥 Customer Management": "customers",
-        "📱 QR Code Generator": "qr_codes",
-        "💬 Customer Feedback": "feedback"
-    }
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
-    selected_page = st.sidebar.radio("Select Page", list(pages.keys()))
-    page_key = pages[selected_page]
-
-    # Page routing
-    if page_key == "dashboard":
-        dashboard()
-    elif page_key == "restaurants":
-        restaurant_management_page()
-    elif page_key == "menu":
-        menu_management_page()
-    elif page_key == "sales":
-        sales_dashboard()
-    elif page_key == "marketing":
-        marketing_campaigns()
-    elif page_key == "customers":
-        customer_management()
-    elif page_key == "qr_codes":
-        generate_qr_code()
-    elif page_key == "feedback":
-        feedback_management()
+    # Sidebar navigation and routing
+    st.navigation(list(_PAGES.values())).run()
 
 
 def dashboard():
     """Main dashboard with overview metrics"""
     st.subheader("📊 Dashboard Overview")
 
+    # Look each collection up once; every access through session state goes via its proxy
+    restaurants = st.session_state.restaurants
+    menu_df = st.session_state.menu_df
+    customers = st.session_state.customers
+    campaigns = st.session_state.marketing_campaigns
+
     # Quick metrics
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        restaurant_count = len(st.session_state.restaurants)
-        st.metric("🏪 Restaurants", restaurant_count)
+        st.metric("🏪 Restaurants", len(restaurants))
 
     with col2:
-        menu_count = len(st.session_state.menu_items)
-        st.metric("🍽️ Menu Items", menu_count)
+        st.metric("🍽️ Menu Items", len(menu_df))
 
     with col3:
-        customer_count = len(st.session_state.customers)
-        st.metric("👥 Customers", customer_count)
+        st.metric("👥 Customers", len(customers))
 
     with col4:
-        campaign_count = len(st.session_state.marketing_campaigns)
-        st.metric("📢 Campaigns", campaign_count)
+        st.metric("📢 Campaigns", len(campaigns))
 
     # Quick actions
     st.markdown("---")
@@ -974,32 +1161,27 @@ def dashboard():
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("➕ Add Restaurant", use_container_width=True):
-            st.session_state.current_page = "restaurants"
-            st.rerun()
+        st.page_link(_PAGES["restaurants"], label="➕ Add Restaurant", use_container_width=True)
 
     with col2:
-        if st.button("📋 Add Menu Item", use_container_width=True):
-            st.session_state.current_page = "menu"
-            st.rerun()
+        st.page_link(_PAGES["menu"], label="📋 Add Menu Item", use_container_width=True)
 
     with col3:
-        if st.button("📢 Create Campaign", use_container_width=True):
-            st.session_state.current_page = "marketing"
-            st.rerun()
+        st.page_link(_PAGES["marketing"], label="📢 Create Campaign", use_container_width=True)
 
     # Recent activity
     st.markdown("---")
     st.subheader("📈 Recent Activity")
 
-    if st.session_state.menu_items:
+    if not menu_df.empty:
         st.write("**Recent Menu Items:**")
-        for item in st.session_state.menu_items[-3:]:
-            st.write(f"• {item['item_name']} at {item['restaurant_name']}")
+        recent_items = menu_df.tail(3)
+        for item_name, restaurant_name in zip(recent_items['item_name'], recent_items['restaurant_name']):
+            st.write(f"• {item_name} at {restaurant_name}")
 
-    if st.session_state.marketing_campaigns:
+    if campaigns:
         st.write("**Active Campaigns:**")
-        for campaign in st.session_state.marketing_campaigns[-3:]:
+        for campaign in campaigns[-3:]:
             st.write(f"• {campaign['name']} - {campaign['type']}")
 
 
@@ -1025,5 +1207,19 @@ def menu_management_page():
         view_menu()
 
 
+# Page registry, keyed as the sidebar routes used to be
+_PAGES = {
+    "dashboard": st.Page(dashboard, title="Dashboard", icon="🏠", default=True),
+    "restaurants": st.Page(restaurant_management_page, title="Restaurant Management", icon="🏪",
+                           url_path="restaurants"),
+    "menu": st.Page(menu_management_page, title="Menu Management", icon="📋", url_path="menu"),
+    "sales": st.Page(sales_dashboard, title="Sales Analytics", icon="📊", url_path="sales"),
+    "marketing": st.Page(marketing_campaigns, title="Marketing Campaigns", icon="📢", url_path="marketing"),
+    "customers": st.Page(customer_management, title="Customer Management", icon="👥", url_path="customers"),
+    "qr_codes": st.Page(generate_qr_code, title="QR Code Generator", icon="📱", url_path="qr_codes"),
+    "feedback": st.Page(feedback_management, title="Customer Feedback", icon="💬", url_path="feedback"),
+}
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file